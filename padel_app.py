@@ -1,7 +1,9 @@
 import streamlit as st
 import sqlite3
-import pandas as pd
+import threading
+import numpy as np
 import math
+from numba import njit
 
 # --- CONFIGURATION ---
 DB_FILE = "padel_league.db"
@@ -11,95 +13,266 @@ PROVISIONAL_LIMIT = 5
 RATING_FLOOR = 100  # Equivalent to 1.0
 SCALING_FACTOR = 100 # To convert 1.0 -> 100
 
+# --- SQL STATEMENTS ---
+
+_SQL_CREATE_PLAYERS = '''CREATE TABLE IF NOT EXISTS players (
+                            id INTEGER PRIMARY KEY AUTOINCREMENT,
+                            name TEXT UNIQUE,
+                            rating INTEGER,
+                            matches_played INTEGER
+                        )'''
+
+# Returns (rating, matches_played) for the four players in the order they are bound
+_SQL_SELECT_MATCH_PLAYERS = '''SELECT rating, matches_played FROM players WHERE id=?
+                               UNION ALL SELECT rating, matches_played FROM players WHERE id=?
+                               UNION ALL SELECT rating, matches_played FROM players WHERE id=?
+                               UNION ALL SELECT rating, matches_played FROM players WHERE id=?'''
+# Updates all four players of a 2v2 match in one statement; binds (id, rating, matches_played) x 4
+_SQL_UPDATE_MATCH_PLAYERS = '''WITH new(pid, r, m) AS (VALUES (?, ?, ?), (?, ?, ?), (?, ?, ?), (?, ?, ?))
+                               UPDATE players
+                               SET rating = (SELECT r FROM new WHERE pid = players.id),
+                                   matches_played = (SELECT m FROM new WHERE pid = players.id)
+                               WHERE id IN (SELECT pid FROM new)'''
+_SQL_INSERT_MATCH = '''INSERT INTO matches 
+                       (p1_id, p2_id, p3_id, p4_id, score_team1, score_team2, rating_change_team1, rating_change_team2)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+
 # --- DATABASE FUNCTIONS ---
 
+def _connect():
+    """Open an autocommit connection with the app's PRAGMAs applied."""
+    conn = sqlite3.connect(DB_FILE, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    # WAL lets readers on their own connections see the last committed snapshot
+    # while a writer's transaction is open. synchronous=NORMAL skips the fsync
+    # on each commit: a power loss can drop the last few matches, but never
+    # corrupts the file. Acceptable for a league table.
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=30000;
+        PRAGMA cache_size=-20000;
+        PRAGMA temp_store=MEMORY;
+    """)
+    return conn
+
+@st.cache_resource
+def get_conn():
+    """Single long-lived write connection shared across reruns and sessions.
+    Only use it while holding get_write_lock()."""
+    return _connect()
+
+@st.cache_resource
+def get_write_lock():
+    """Serializes writers from concurrent Streamlit sessions on the shared connection."""
+    return threading.Lock()
+
+@st.cache_resource
+def get_read_conn():
+    """Single long-lived read connection shared across reruns and sessions.
+    Separate from the write connection so reads never see another session's
+    uncommitted transaction. Only use it while holding get_read_lock()."""
+    return _connect()
+
+@st.cache_resource
+def get_read_lock():
+    """Serializes readers from concurrent Streamlit sessions on the shared read connection."""
+    return threading.Lock()
+
+def read_query(sql, params=()):
+    """Run a SELECT on the read connection and return all rows."""
+    with get_read_lock():
+        return get_read_conn().execute(sql, params).fetchall()
+
 def init_db():
     """Initialize the SQLite database with players and matches tables."""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
+    with get_write_lock():
+        conn = get_conn()
+        c = conn.cursor()
     
-    # Create Players Table
-    c.execute('''CREATE TABLE IF NOT EXISTS players (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT UNIQUE,
-                    rating REAL,
-                    matches_played INTEGER
-                )''')
+        # Create Players Table
+        # Ratings are fixed-point: display value x SCALING_FACTOR, stored as INTEGER
+        c.execute(_SQL_CREATE_PLAYERS)
     
-    # Create Matches Table
-    c.execute('''CREATE TABLE IF NOT EXISTS matches (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    p1_id INTEGER, p2_id INTEGER,
-                    p3_id INTEGER, p4_id INTEGER,
-                    score_team1 INTEGER,
-                    score_team2 INTEGER,
-                    rating_change_team1 REAL,
-                    rating_change_team2 REAL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )''')
-    conn.commit()
-    conn.close()
+        # Create Matches Table
+        c.execute('''CREATE TABLE IF NOT EXISTS matches (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        p1_id INTEGER, p2_id INTEGER,
+                        p3_id INTEGER, p4_id INTEGER,
+                        score_team1 INTEGER,
+                        score_team2 INTEGER,
+                        rating_change_team1 REAL,
+                        rating_change_team2 REAL,
+                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )''')
 
-def add_player(name, initial_rating_display):
-    """Add a new player. Input rating is 1.0-10.0, stored as 100-1000."""
-    backend_rating = initial_rating_display * SCALING_FACTOR
-    conn = sqlite3.connect(DB_FILE)
+        # Index for match history (newest first)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_matches_ts ON matches(timestamp DESC)")
+
+        version = c.execute("PRAGMA user_version").fetchone()[0]
+        # Schema version 1: ratings moved from REAL to INTEGER. The column type can
+        # only change by rebuilding the table, so copy rows across with rounded ratings.
+        if version < 1:
+            _migrate(conn, 1, [
+                "ALTER TABLE players RENAME TO players_old",
+                _SQL_CREATE_PLAYERS,
+                '''INSERT INTO players (id, name, rating, matches_played)
+                   SELECT id, name, CAST(ROUND(rating) AS INTEGER), matches_played
+                   FROM players_old''',
+                "DROP TABLE players_old",
+            ])
+        # Schema version 2: keep each player's starting rating so history can be replayed.
+        # It is only known for players without matches; the rest stay NULL until
+        # a starting level is entered for them in the Admin tab.
+        if version < 2:
+            _migrate(conn, 2, [
+                "ALTER TABLE players ADD COLUMN initial_rating INTEGER",
+                "UPDATE players SET initial_rating = rating WHERE matches_played = 0",
+            ])
+
+        # Leaderboard ordering; created after the migration, which rebuilds the players table
+        c.execute("CREATE INDEX IF NOT EXISTS idx_players_rating ON players(rating DESC)")
+
+def _migrate(conn, version, statements):
+    """Apply one schema migration atomically and record it in user_version."""
     c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
     try:
-        c.execute("INSERT INTO players (name, rating, matches_played) VALUES (?, ?, ?)", 
-                  (name, backend_rating, 0))
+        for sql in statements:
+            c.execute(sql)
+        c.execute(f"PRAGMA user_version = {version}")
         conn.commit()
-        success = True
-    except sqlite3.IntegrityError:
-        success = False
-    conn.close()
+    except Exception:
+        conn.rollback()
+        raise
+
+def add_player(name, initial_rating_display):
+    """Add a new player. Input rating is 1.0-10.0, stored as 100-1000."""
+    backend_rating = int(round(initial_rating_display * SCALING_FACTOR))
+    with get_write_lock():
+        c = get_conn().cursor()
+        try:
+            c.execute("INSERT INTO players (name, rating, matches_played, initial_rating) VALUES (?, ?, ?, ?)", 
+                      (name, backend_rating, 0, backend_rating))
+            success = True
+        except sqlite3.IntegrityError:
+            success = False
+    if success:
+        clear_read_caches()
     return success
 
-def get_players():
-    """Fetch all players for dropdowns."""
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query("SELECT id, name, rating, matches_played FROM players ORDER BY name", conn)
-    conn.close()
-    return df
+@st.cache_data(ttl=60)
+def get_player_choices():
+    """Fetch (id, name) tuples for the player dropdowns, ordered by name."""
+    # Only the columns the dropdowns need; ordering comes off the UNIQUE(name) index
+    rows = read_query("SELECT id, name FROM players ORDER BY name")
+    return [tuple(row) for row in rows]
 
+@st.cache_data(ttl=60)
 def get_leaderboard():
     """Fetch leaderboard sorted by rating."""
-    conn = sqlite3.connect(DB_FILE)
-    df = pd.read_sql_query("SELECT name, rating, matches_played FROM players ORDER BY rating DESC", conn)
-    conn.close()
-    # Convert backend rating (100-1000) to frontend display (1.0-10.0)
-    df['Display Rating'] = df['rating'] / SCALING_FACTOR
-    return df
+    # Rank and column names are produced by SQL so rows are ready for st.dataframe.
+    # Backend rating (100-1000) is converted to frontend display (1.0-10.0).
+    rows = read_query('''
+        SELECT
+            ROW_NUMBER() OVER (ORDER BY rating DESC) AS "Rank",
+            name AS "Player",
+            rating / :scale AS "Rating (1.0-10.0)",
+            matches_played AS "Games Played",
+            -- Provisional players (higher K-factor) get a badge and the games left until graduation
+            CASE WHEN matches_played < :limit
+                 THEN '★ Provisional (' || (:limit - matches_played) || ' left)'
+                 ELSE '' END AS "Status"
+        FROM players
+        ORDER BY rating DESC
+    ''', {"scale": float(SCALING_FACTOR), "limit": PROVISIONAL_LIMIT})
+    return [dict(row) for row in rows]
+
+def clear_read_caches():
+    """Drop cached player/leaderboard reads after a write, for every session."""
+    get_player_choices.clear()
+    get_leaderboard.clear()
 
 def get_match_history():
-    """Fetch recent matches."""
-    conn = sqlite3.connect(DB_FILE)
+    """Fetch the 100 most recent matches, formatted for display."""
     query = '''
         SELECT 
-            m.id, 
-            p1.name as p1, p2.name as p2, 
-            p3.name as p3, p4.name as p4,
-            m.score_team1, m.score_team2,
-            m.timestamp
+            m.timestamp AS "When",
+            p1.name || ' & ' || p2.name AS "Team 1",
+            m.score_team1 || ' – ' || m.score_team2 AS "Score",
+            p3.name || ' & ' || p4.name AS "Team 2"
         FROM matches m
         JOIN players p1 ON m.p1_id = p1.id
         JOIN players p2 ON m.p2_id = p2.id
         JOIN players p3 ON m.p3_id = p3.id
         JOIN players p4 ON m.p4_id = p4.id
         ORDER BY m.timestamp DESC
+        LIMIT 100
     '''
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    return [dict(row) for row in read_query(query)]
 
 # --- ELO MATH LOGIC ---
 
+_LN10_OVER_400 = math.log(10) / 400.0
+
+@njit(cache=True)
 def calculate_expected_score(rating_a, rating_b):
     """
     Logistic curve formula.
     Returns the win probability (0 to 1) for Team A.
     """
-    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+    # 10 ** (x / 400) == exp(x * ln(10) / 400)
+    return 1.0 / (1.0 + math.exp((rating_b - rating_a) * _LN10_OVER_400))
+
+@njit(cache=True)
+def elo_step(ratings, matches_played, score_t1, score_t2):
+    """
+    ELO update for one 2v2 match.
+    ratings / matches_played are int64 arrays ordered [T1 P1, T1 P2, T2 P1, T2 P2].
+    Returns the four new ratings.
+    """
+    # Team Ratings (Average)
+    team1_rating = (ratings[0] + ratings[1]) / 2
+    team2_rating = (ratings[2] + ratings[3]) / 2
+
+    # Expected Score
+    expected_t1 = calculate_expected_score(team1_rating, team2_rating)
+
+    # Actual Score (Fractional / Margin of Victory)
+    actual_t1 = score_t1 / (score_t1 + score_t2)
+
+    # We calculate individual deltas because K-factors might differ per player
+    # (e.g., a Newbie playing with a Pro)
+    k = np.where(matches_played < PROVISIONAL_LIMIT, K_FACTOR_PROVISIONAL, K_FACTOR_STANDARD)
+    # Note: actual_t2 = 1 - actual_t1, expected_t2 = 1 - expected_t1
+    # So (Actual - Expected) for T2 is (1 - actual_t1) - (1 - expected_t1) = -delta
+    delta = actual_t1 - expected_t1
+    signs = np.array([1, 1, -1, -1])
+    # Round to whole backend points to keep ratings integer
+    change = np.rint(k * signs * delta).astype(np.int64)
+    return np.maximum(RATING_FLOOR, ratings + change)
+
+@njit(cache=True)
+def apply_matches(ratings, matches_played, player_idx, scores_t1, scores_t2):
+    """
+    Replay matches in order, updating ratings / matches_played in place.
+    player_idx is an N x 4 array of positions into ratings, one row per match.
+    Returns the Team 1 reference rating change of each match.
+    """
+    n = player_idx.shape[0]
+    ref_changes = np.empty(n, dtype=np.int64)
+    current = np.empty(4, dtype=np.int64)
+    played = np.empty(4, dtype=np.int64)
+    for i in range(n):
+        for j in range(4):
+            current[j] = ratings[player_idx[i, j]]
+            played[j] = matches_played[player_idx[i, j]]
+        new_ratings = elo_step(current, played, scores_t1[i], scores_t2[i])
+        ref_changes[i] = new_ratings[0] - current[0]
+        for j in range(4):
+            ratings[player_idx[i, j]] = new_ratings[j]
+            matches_played[player_idx[i, j]] += 1
+    return ref_changes
 
 def process_match(p1_id, p2_id, p3_id, p4_id, score_t1, score_t2):
     """
@@ -111,74 +284,113 @@ def process_match(p1_id, p2_id, p3_id, p4_id, score_t1, score_t2):
     5. Determine K-Factor (Provisional vs Standard).
     6. Update Database.
     """
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    # 1. Fetch current data
-    players = {}
-    for pid in [p1_id, p2_id, p3_id, p4_id]:
-        c.execute("SELECT rating, matches_played FROM players WHERE id=?", (pid,))
-        players[pid] = c.fetchone()
-    
-    r1, m1 = players[p1_id]
-    r2, m2 = players[p2_id]
-    r3, m3 = players[p3_id]
-    r4, m4 = players[p4_id]
-    
-    # 2. Team Ratings (Average)
-    team1_rating = (r1 + r2) / 2
-    team2_rating = (r3 + r4) / 2
-    
-    # 3. Expected Score
-    expected_t1 = calculate_expected_score(team1_rating, team2_rating)
-    
-    # 4. Actual Score (Fractional / Margin of Victory)
+    # Validate before touching the database
     total_points = score_t1 + score_t2
     if total_points == 0:
         return False, "Total points cannot be zero."
-        
-    actual_t1 = score_t1 / total_points
-    
-    # 5. Calculate Changes
-    # We calculate individual deltas because K-factors might differ per player
-    # (e.g., a Newbie playing with a Pro)
-    
-    updates = []
-    
-    # Team 1 Updates
-    for pid, rating, matches in [(p1_id, r1, m1), (p2_id, r2, m2)]:
-        k = K_FACTOR_PROVISIONAL if matches < PROVISIONAL_LIMIT else K_FACTOR_STANDARD
-        change = k * (actual_t1 - expected_t1)
-        new_rating = max(RATING_FLOOR, rating + change)
-        updates.append((pid, new_rating, matches + 1))
-        
-    # Team 2 Updates
-    # Note: actual_t2 = 1 - actual_t1, expected_t2 = 1 - expected_t1
-    # So (Actual - Expected) for T2 is equivalent to -(Actual_T1 - Expected_T1)
-    for pid, rating, matches in [(p3_id, r3, m3), (p4_id, r4, m4)]:
-        k = K_FACTOR_PROVISIONAL if matches < PROVISIONAL_LIMIT else K_FACTOR_STANDARD
-        change = k * ((1 - actual_t1) - (1 - expected_t1))
-        new_rating = max(RATING_FLOOR, rating + change)
-        updates.append((pid, new_rating, matches + 1))
-
-    # 6. Commit to DB
-    # Update Players
-    for pid, new_r, new_m in updates:
-        c.execute("UPDATE players SET rating=?, matches_played=? WHERE id=?", (new_r, new_m, pid))
+    if len({p1_id, p2_id, p3_id, p4_id}) != 4:
+        return False, "The same player was selected multiple times."
+
+    with get_write_lock():
+        conn = get_conn()
+        c = conn.cursor()
+        # One transaction for all reads and writes: a single journal sync per match
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            # 1. Fetch current data
+            c.execute(_SQL_SELECT_MATCH_PLAYERS, (p1_id, p2_id, p3_id, p4_id))
+            (r1, m1), (r2, m2), (r3, m3), (r4, m4) = c.fetchall()
     
-    # Record Match
-    # Storing the rating change for Team 1 (avg) for historical reference
-    # We just grab the delta calculated for the first player of T1 as a reference point
-    ref_change = updates[0][1] - r1 
+            # 2-5. Team averages, expected/actual score, K-factors and new ratings
+            ratings = np.array([r1, r2, r3, r4], dtype=np.int64)
+            matches = np.array([m1, m2, m3, m4], dtype=np.int64)
+            new_ratings = elo_step(ratings, matches, score_t1, score_t2)
+            updates = list(zip([p1_id, p2_id, p3_id, p4_id], new_ratings.tolist(), (matches + 1).tolist()))
+
+            # 6. Commit to DB
+            # Update Players
+            c.execute(_SQL_UPDATE_MATCH_PLAYERS, [value for update in updates for value in update])
     
-    c.execute('''INSERT INTO matches 
-                 (p1_id, p2_id, p3_id, p4_id, score_team1, score_team2, rating_change_team1, rating_change_team2)
-                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-              (p1_id, p2_id, p3_id, p4_id, score_t1, score_t2, ref_change, -ref_change))
+            # Record Match
+            # Storing the rating change for Team 1 (avg) for historical reference
+            # We just grab the delta calculated for the first player of T1 as a reference point
+            ref_change = updates[0][1] - r1 
     
-    conn.commit()
-    conn.close()
-    return True, f"Match recorded! Rating change: {ref_change/SCALING_FACTOR:.3f} (Display Units)"
+            c.execute(_SQL_INSERT_MATCH,
+                      (p1_id, p2_id, p3_id, p4_id, score_t1, score_t2, ref_change, -ref_change))
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        clear_read_caches()
+        return True, f"Match recorded! Rating change: {ref_change/SCALING_FACTOR:.3f} (Display Units)"
+
+def get_starting_levels():
+    """Fetch (id, name, initial_rating) for every player; initial_rating is None
+    for players registered before initial ratings were tracked."""
+    rows = read_query("SELECT id, name, initial_rating FROM players ORDER BY name")
+    return [tuple(row) for row in rows]
+
+def set_initial_ratings(initial_ratings_display):
+    """Store starting levels {player_id: 1.0-10.0} used by recompute_all()."""
+    updates = [(int(round(level * SCALING_FACTOR)), pid) for pid, level in initial_ratings_display.items()]
+    with get_write_lock():
+        conn = get_conn()
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.executemany("UPDATE players SET initial_rating=? WHERE id=?", updates)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+def recompute_all():
+    """
+    Admin: replay the full match history from each player's initial rating,
+    e.g. after a change to the scoring rules. Rewrites player ratings, games
+    played and the per-match rating changes.
+    """
+    with get_write_lock():
+        conn = get_conn()
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.execute("SELECT id, initial_rating FROM players ORDER BY id")
+            player_rows = c.fetchall()
+            if any(initial is None for _, initial in player_rows):
+                conn.rollback()
+                return False, "Set a starting level for every player before recomputing."
+
+            ids = [pid for pid, _ in player_rows]
+            index = {pid: i for i, pid in enumerate(ids)}
+            ratings = np.array([initial for _, initial in player_rows], dtype=np.int64)
+            matches = np.zeros(len(ids), dtype=np.int64)
+
+            c.execute("SELECT id, p1_id, p2_id, p3_id, p4_id, score_team1, score_team2 FROM matches ORDER BY id")
+            match_rows = c.fetchall()
+            match_ids = [row[0] for row in match_rows]
+            player_idx = np.array([[index[pid] for pid in row[1:5]] for row in match_rows],
+                                  dtype=np.int64).reshape(-1, 4)
+            scores_t1 = np.array([row[5] for row in match_rows], dtype=np.int64)
+            scores_t2 = np.array([row[6] for row in match_rows], dtype=np.int64)
+
+            ref_changes = apply_matches(ratings, matches, player_idx, scores_t1, scores_t2).tolist()
+            match_changes = [(ref, -ref, mid) for ref, mid in zip(ref_changes, match_ids)]
+
+            c.executemany("UPDATE players SET rating=?, matches_played=? WHERE id=?",
+                          zip(ratings.tolist(), matches.tolist(), ids))
+            c.executemany("UPDATE matches SET rating_change_team1=?, rating_change_team2=? WHERE id=?",
+                          match_changes)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        clear_read_caches()
+        return True, f"Recomputed ratings from {len(match_changes)} matches."
 
 # --- STREAMLIT UI ---
 
@@ -189,23 +401,19 @@ def main():
     st.title("🎾 Padel Americano League")
     st.markdown("### 2v2 Modified Elo System")
 
-    menu = ["Leaderboard", "Record Match", "Register Player", "Match History"]
+    menu = ["Leaderboard", "Record Match", "Register Player", "Match History", "Admin"]
     choice = st.sidebar.selectbox("Navigation", menu)
 
     # --- LEADERBOARD TAB ---
     if choice == "Leaderboard":
         st.header("🏆 League Standings")
-        df = get_leaderboard()
+        rows = get_leaderboard()
         
-        if not df.empty:
-            # Formatting for display
-            df['Rank'] = range(1, len(df) + 1)
-            df = df[['Rank', 'name', 'Display Rating', 'matches_played']]
-            df.columns = ['Rank', 'Player', 'Rating (1.0-10.0)', 'Games Played']
-            
+        if rows:
             # Highlight top players
             st.dataframe(
-                df.style.format({"Rating (1.0-10.0)": "{:.2f}"}),
+                rows,
+                column_config={"Rating (1.0-10.0)": st.column_config.NumberColumn(format="%.2f")},
                 use_container_width=True,
                 hide_index=True
             )
@@ -216,27 +424,25 @@ def main():
     elif choice == "Record Match":
         st.header("📝 Record Match Result")
         
-        player_df = get_players()
+        player_choices = get_player_choices()
         
-        if len(player_df) < 4:
+        if len(player_choices) < 4:
             st.warning("You need at least 4 players registered to record a match.")
         else:
             # Create a dictionary for dropdowns {name: id}
-            player_dict = dict(zip(player_df['name'], player_df['id']))
-            player_names = list(player_dict.keys())
+            player_dict = {name: pid for pid, name in player_choices}
+            player_names = [name for _, name in player_choices]
 
             col1, col2, col3 = st.columns([1, 0.2, 1])
 
             with col1:
                 st.subheader("Team 1")
-                t1_p1 = st.selectbox("Player 1", player_names, key="p1")
-                t1_p2 = st.selectbox("Player 2", player_names, key="p2")
+                team1 = st.multiselect("Players", player_names, max_selections=2, key="team1")
                 score_t1 = st.number_input("Team 1 Points", min_value=0, value=0)
 
             with col3:
                 st.subheader("Team 2")
-                t2_p1 = st.selectbox("Player 3", player_names, key="p3")
-                t2_p2 = st.selectbox("Player 4", player_names, key="p4")
+                team2 = st.multiselect("Players", player_names, max_selections=2, key="team2")
                 score_t2 = st.number_input("Team 2 Points", min_value=0, value=0)
 
             with col2:
@@ -245,16 +451,17 @@ def main():
                 st.markdown("<h2 style='text-align: center;'>VS</h2>", unsafe_allow_html=True)
 
             if st.button("Submit Result", type="primary"):
-                # Validation
-                selected_players = [t1_p1, t1_p2, t2_p1, t2_p2]
-                if len(set(selected_players)) != 4:
+                # Validation (each multiselect already rules out duplicates within a team)
+                if len(team1) != 2 or len(team2) != 2:
+                    st.error("Error: Select exactly two players for each team.")
+                elif set(team1) & set(team2):
                     st.error("Error: You selected the same player multiple times.")
                 elif score_t1 == 0 and score_t2 == 0:
                     st.error("Error: Total points cannot be zero.")
                 else:
                     # Process
-                    p1_id, p2_id = player_dict[t1_p1], player_dict[t1_p2]
-                    p3_id, p4_id = player_dict[t2_p1], player_dict[t2_p2]
+                    p1_id, p2_id = player_dict[team1[0]], player_dict[team1[1]]
+                    p3_id, p4_id = player_dict[team2[0]], player_dict[team2[1]]
                     
                     success, msg = process_match(p1_id, p2_id, p3_id, p4_id, score_t1, score_t2)
                     if success:
@@ -285,17 +492,55 @@ def main():
     # --- HISTORY TAB ---
     elif choice == "Match History":
         st.header("📜 Recent Matches")
-        df = get_match_history()
+        matches = get_match_history()
         
-        if not df.empty:
-            for index, row in df.iterrows():
-                with st.container():
-                    st.markdown(f"""
-                    **{row['timestamp']}** {row['p1']} & {row['p2']} **({row['score_team1']})** vs **({row['score_team2']})** {row['p3']} & {row['p4']}
-                    ___
-                    """)
+        if matches:
+            st.dataframe(matches, hide_index=True, use_container_width=True)
         else:
             st.info("No matches recorded yet.")
 
+    # --- ADMIN TAB ---
+    elif choice == "Admin":
+        st.header("⚙️ Admin")
+        starting_levels = get_starting_levels()
+
+        if not starting_levels:
+            st.info("No players registered yet.")
+        else:
+            st.subheader("Starting Levels")
+            st.write("Each player's level before their first recorded match. "
+                     "Recomputing replays every match from these levels.")
+            missing = [name for _, name, initial in starting_levels if initial is None]
+            if missing:
+                # A current rating already includes past matches, so it can't stand in for a starting level
+                st.warning("Players registered before starting levels were recorded have none yet: "
+                           f"{', '.join(missing)}. Enter the level they had before their first match.")
+
+            with st.form("initial_ratings_form"):
+                levels = {
+                    pid: st.number_input(name, min_value=1.0, max_value=10.0, step=0.1, key=f"initial_{pid}",
+                                         value=None if initial is None else initial / SCALING_FACTOR)
+                    for pid, name, initial in starting_levels
+                }
+                if st.form_submit_button("Save Starting Levels"):
+                    if any(level is None for level in levels.values()):
+                        st.error("Error: Enter a starting level for every player.")
+                    else:
+                        set_initial_ratings(levels)
+                        st.rerun()
+
+            st.subheader("Recompute Ratings")
+            if missing:
+                st.info("Save a starting level for every player to enable recomputing.")
+            else:
+                confirmed = st.checkbox("I understand this rewrites every player's rating "
+                                        "and the rating change of every recorded match.")
+                if st.button("Recompute All Ratings", type="primary", disabled=not confirmed):
+                    success, msg = recompute_all()
+                    if success:
+                        st.success(msg)
+                    else:
+                        st.error(msg)
+
 if __name__ == "__main__":
     main()